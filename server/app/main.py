@@ -2,46 +2,105 @@
 FastAPI microservice for downloading research papers using SciDownl.
 
 This service provides a simple HTTP API for downloading papers by DOI, PMID, or title.
-Downloads are processed in background threads and status can be polled.
+Downloads run as background asyncio tasks: the blocking Sci-Hub mirror lookup
+goes to a bounded thread pool, the PDF itself is streamed in-process, and
+status can be polled.
 """
 
 import os
-import uuid
-import threading
+import asyncio
+import hmac
+import logging
+import secrets
 import shutil
-from typing import Dict, Optional, Literal
-from datetime import datetime
-from pathlib import Path
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional, Set
+from datetime import datetime, timezone
 
+import httpx
 from fastapi import FastAPI, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from scidownl import scihub_download
 from app.services.pdf_extraction_service import (
     ExtractStudiesRequest,
     ExtractStudiesResponse,
+    close_pdf_client,
     extract_studies_batch,
+    shutdown_extraction_pool,
 )
+from app.services.scihub_service import STORAGE_DIR, PaperType, resolve_pdf_url, stream_pdf
+from app.services.task_store import OWNER_HEARTBEAT_SECONDS, TaskUpdateWriter, create_task_store
 
-# Configuration
-STORAGE_DIR = Path(__file__).parent.parent / "storage"
-STORAGE_DIR.mkdir(exist_ok=True)
+logger = logging.getLogger(__name__)
 
 # Security Constants
 MAX_TASKS = 100
 MAX_CONCURRENT_DOWNLOADS = 5
+MAX_DOWNLOAD_CONNECTIONS = 64
+DOWNLOAD_TIMEOUT_SECONDS = 60
 PDF_EXTRACTOR_BEARER_TOKEN = os.getenv("PDF_EXTRACTOR_BEARER_TOKEN", "").strip()
+ORPHANED_TASK_ERROR = "Download interrupted because the server stopped."
+
+# Task storage (Redis when REDIS_URL is set, otherwise sharded in-memory)
+task_store = create_task_store(MAX_TASKS)
+# Worker status transitions are queued and applied in batches by one thread
+task_updates = TaskUpdateWriter(task_store)
+# Bounded pool for the blocking mirror lookups; excess submissions queue in the pool
+download_executor = ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENT_DOWNLOADS,
+    thread_name_prefix="download",
+)
+# One pooled client streams every PDF on the event loop
+download_client = httpx.AsyncClient(
+    timeout=DOWNLOAD_TIMEOUT_SECONDS,
+    follow_redirects=True,
+    limits=httpx.Limits(max_connections=MAX_DOWNLOAD_CONNECTIONS),
+)
+# Strong references so running download tasks aren't garbage collected
+background_downloads: Set[asyncio.Task] = set()
+
+
+async def maintain_task_store():
+    """Renew this process's task lease and fail tasks left by dead processes."""
+    while True:
+        try:
+            await call_store(task_store.heartbeat)
+            await call_store(task_store.fail_orphaned_tasks, ORPHANED_TASK_ERROR)
+        except Exception:
+            logger.exception("Task store maintenance failed")
+        await asyncio.sleep(OWNER_HEARTBEAT_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Take the lease before accepting downloads so no task is created unowned
+    await call_store(task_store.heartbeat)
+    maintenance = asyncio.create_task(maintain_task_store())
+    yield
+    maintenance.cancel()
+    # Interrupted downloads record a failed status on their way out
+    for task in list(background_downloads):
+        task.cancel()
+    await asyncio.gather(*background_downloads, return_exceptions=True)
+    await download_client.aclose()
+    await close_pdf_client()
+    # Drop queued lookups; in-flight ones finish on their own
+    download_executor.shutdown(wait=False, cancel_futures=True)
+    shutdown_extraction_pool()
+    # Flush queued status transitions before the process exits
+    await asyncio.to_thread(task_updates.close)
 
-# Task storage (in-memory for lightweight implementation)
-tasks: Dict[str, dict] = {}
-tasks_lock = threading.Lock()
-# Semaphore to limit concurrent background downloads
-download_semaphore = threading.Semaphore(MAX_CONCURRENT_DOWNLOADS)
 
 app = FastAPI(
     title="Research Paper Download Service",
     description="Lightweight microservice for downloading research papers",
     version="1.0.0",
+    lifespan=lifespan,
+    # orjson encodes the task listings and extraction payloads in native code
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware to allow frontend to call this API
@@ -57,7 +116,7 @@ app.add_middleware(
 class DownloadRequest(BaseModel):
     """Request model for paper download."""
     keyword: str = Field(..., max_length=500, description="DOI, PMID, or paper title")
-    paper_type: Literal["doi", "pmid", "title"] = Field(..., description="Type of keyword")
+    paper_type: PaperType = Field(..., description="Type of keyword")
 
 
 class DownloadResponse(BaseModel):
@@ -78,51 +137,99 @@ class TaskStatus(BaseModel):
     error: Optional[str] = None
 
 
-def download_paper_task(task_id: str, keyword: str, paper_type: str):
+async def call_store(method, *args):
+    """Call a task store method, off the event loop when it does network I/O."""
+    if task_store.blocking:
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+
+def format_timestamp(ns: Optional[int]) -> Optional[str]:
+    """Format an epoch-nanosecond timestamp as a naive UTC ISO string."""
+    if ns is None:
+        return None
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def task_view(task: dict) -> dict:
     """
-    Background task to download a paper using SciDownl.
+    Convert a stored task record to its API shape.
+
+    Timestamps are kept as integers in the store and only formatted here,
+    at the response boundary.
     """
-    with download_semaphore:
-        task_dir = STORAGE_DIR / task_id
-        try:
-            with tasks_lock:
-                if task_id in tasks:
-                    tasks[task_id]["status"] = "processing"
+    view = {k: v for k, v in task.items() if k not in ("created_at_ns", "completed_at_ns")}
+    view["created_at"] = format_timestamp(task["created_at_ns"])
+    view["completed_at"] = format_timestamp(task.get("completed_at_ns"))
+    return view
+
+
+def resolve_task_pdf_url(task_id: str, keyword: str, paper_type: PaperType) -> Optional[str]:
+    """Mark a task as processing and look up its PDF URL (runs in the pool)."""
+    task_updates.put(task_id, status="processing")
+    return resolve_pdf_url(keyword, paper_type)
 
+
+async def download_paper_task(task_id: str, keyword: str, paper_type: PaperType):
+    """
+    Background task to download a paper.
+
+    SciDownl only resolves the mirror's PDF URL; the transfer itself is
+    streamed by the shared async client, so no thread is held while bytes
+    are in flight.
+    """
+    task_dir = STORAGE_DIR / task_id
+    target = task_dir / f"{task_id}.pdf"
+    saved_pdf = False
+    try:
+        pdf_url = await asyncio.get_running_loop().run_in_executor(
+            download_executor,
+            resolve_task_pdf_url,
+            task_id,
+            keyword,
+            paper_type,
+        )
+
+        if pdf_url:
             task_dir.mkdir(exist_ok=True)
-            scihub_download(keyword, paper_type=paper_type, out=str(task_dir))
-
-            downloaded_files = list(task_dir.glob("*.pdf"))
-            if downloaded_files:
-                latest_file = max(downloaded_files, key=lambda p: p.stat().st_mtime)
-                filename = latest_file.name
-                with tasks_lock:
-                    if task_id in tasks:
-                        tasks[task_id].update({
-                            "status": "completed",
-                            "completed_at": datetime.utcnow().isoformat(),
-                            "filename": filename,
-                            "filepath": f"storage/{task_id}/{filename}",
-                        })
-            else:
-                with tasks_lock:
-                    if task_id in tasks:
-                        tasks[task_id].update({
-                            "status": "failed",
-                            "completed_at": datetime.utcnow().isoformat(),
-                            "error": "Paper not available or download failed.",
-                        })
-        except Exception:
-            with tasks_lock:
-                if task_id in tasks:
-                    tasks[task_id].update({
-                        "status": "failed",
-                        "completed_at": datetime.utcnow().isoformat(),
-                        "error": "An unexpected error occurred during download.",
-                    })
-        finally:
-            # Cleanup task directory if no PDF was successfully saved
-            if task_dir.exists() and not list(task_dir.glob("*.pdf")):
+            await stream_pdf(download_client, pdf_url, target)
+            saved_pdf = True
+
+        if saved_pdf:
+            filename = target.name
+            task_updates.put(
+                task_id,
+                status="completed",
+                completed_at_ns=time.time_ns(),
+                filename=filename,
+                filepath=f"storage/{task_id}/{filename}",
+            )
+        else:
+            task_updates.put(
+                task_id,
+                status="failed",
+                completed_at_ns=time.time_ns(),
+                error="Paper not available or download failed.",
+            )
+    except asyncio.CancelledError:
+        task_updates.put(task_id, status="failed", completed_at_ns=time.time_ns(), error=ORPHANED_TASK_ERROR)
+        raise
+    except Exception:
+        task_updates.put(
+            task_id,
+            status="failed",
+            completed_at_ns=time.time_ns(),
+            error="An unexpected error occurred during download.",
+        )
+    finally:
+        # Cleanup task directory if no PDF was successfully saved. It is
+        # usually missing or empty, which a single rmdir() handles.
+        if not saved_pdf:
+            try:
+                task_dir.rmdir()
+            except FileNotFoundError:
+                pass
+            except OSError:
                 shutil.rmtree(task_dir, ignore_errors=True)
 
 
@@ -144,15 +251,16 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    with tasks_lock:
-        active = len([t for t in tasks.values() if t["status"] == "processing"])
-        total = len(tasks)
+    active = await call_store(task_store.count_status, "processing")
+    total = await call_store(task_store.__len__)
     return {
         "status": "healthy",
         "storage_dir": str(STORAGE_DIR),
         "active_tasks": active,
         "total_tasks_cached": total,
-        "concurrency_limit": MAX_CONCURRENT_DOWNLOADS,
+        # Mirror lookups run in a bounded pool; PDF streams share the async client
+        "mirror_lookup_limit": MAX_CONCURRENT_DOWNLOADS,
+        "download_connection_limit": MAX_DOWNLOAD_CONNECTIONS,
         "pdf_extractor_auth_enabled": bool(PDF_EXTRACTOR_BEARER_TOKEN),
     }
 
@@ -162,8 +270,9 @@ def validate_extractor_token(authorization: Optional[str]) -> None:
         return
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing bearer token")
-    supplied = authorization.replace("Bearer ", "", 1).strip()
-    if supplied != PDF_EXTRACTOR_BEARER_TOKEN:
+    supplied = authorization[len("Bearer "):].strip()
+    # Constant-time compare; bytes because compare_digest rejects non-ASCII str
+    if not hmac.compare_digest(supplied.encode(), PDF_EXTRACTOR_BEARER_TOKEN.encode()):
         raise HTTPException(status_code=403, detail="Invalid bearer token")
 
 
@@ -177,7 +286,7 @@ async def extract_studies_endpoint(
     """
     validate_extractor_token(authorization)
     try:
-        return extract_studies_batch(request)
+        return await extract_studies_batch(request)
     except HTTPException:
         raise
     except Exception as exc:
@@ -187,33 +296,23 @@ async def extract_studies_endpoint(
 @app.post("/api/download", response_model=DownloadResponse, status_code=202)
 async def download_paper(request: DownloadRequest):
     """Request a paper download by DOI, PMID, or title."""
-    task_id = str(uuid.uuid4())
+    task_id = secrets.token_hex(16)
     task_record = {
         "task_id": task_id,
         "status": "pending",
-        "created_at": datetime.utcnow().isoformat(),
+        "created_at_ns": time.time_ns(),
         "keyword": request.keyword,
         "paper_type": request.paper_type,
     }
     
-    evict_path = None
-    with tasks_lock:
-        if len(tasks) >= MAX_TASKS:
-            evict_id = next(iter(tasks))
-            evicted = tasks.pop(evict_id)
-            if evicted["status"] != "processing":
-                evict_path = STORAGE_DIR / evict_id
-        tasks[task_id] = task_record
-    
-    if evict_path and evict_path.exists():
-        shutil.rmtree(evict_path, ignore_errors=True)
-
-    thread = threading.Thread(
-        target=download_paper_task,
-        args=(task_id, request.keyword, request.paper_type),
-        daemon=True
-    )
-    thread.start()
+    # Only completed tasks leave a directory behind; failed ones clean up after themselves
+    for evicted in await call_store(task_store.add, task_id, task_record):
+        if evicted.get("filepath"):
+            shutil.rmtree(STORAGE_DIR / evicted["task_id"], ignore_errors=True)
+
+    task = asyncio.create_task(download_paper_task(task_id, request.keyword, request.paper_type))
+    background_downloads.add(task)
+    task.add_done_callback(background_downloads.discard)
     
     return DownloadResponse(
         task_id=task_id,
@@ -222,7 +321,7 @@ async def download_paper(request: DownloadRequest):
     )
 
 
-@app.get("/api/status/{task_id}", response_model=TaskStatus)
+@app.get("/api/status/{task_id}", responses={200: {"model": TaskStatus}})
 async def get_task_status(task_id: str):
     """
     Get the status of a download task.
@@ -233,8 +332,7 @@ async def get_task_status(task_id: str):
     Returns:
         TaskStatus with current task information
     """
-    with tasks_lock:
-        task = tasks.get(task_id)
+    task = await call_store(task_store.get, task_id)
     
     if not task:
         raise HTTPException(
@@ -242,7 +340,10 @@ async def get_task_status(task_id: str):
             detail=f"Task {task_id} not found"
         )
     
-    return TaskStatus(**task)
+    # Records are written only by this service, so they are encoded as-is
+    # instead of being re-validated through a response_model
+    view = task_view(task)
+    return ORJSONResponse({field: view.get(field) for field in TaskStatus.model_fields})
 
 
 @app.get("/api/tasks")
@@ -253,8 +354,7 @@ async def list_tasks():
     Returns:
         List of all tasks with their current status
     """
-    with tasks_lock:
-        all_tasks = list(tasks.values())
+    all_tasks = [task_view(task) for task in await call_store(task_store.values)]
     
     return {
         "total": len(all_tasks),
@@ -264,4 +364,4 @@ async def list_tasks():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
@@ -1,18 +1,37 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
 import io
 import ipaddress
+import multiprocessing
+import os
 import re
 import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
-from typing import Dict, List, Literal, Optional, Tuple
+from typing import Dict, Iterator, List, Literal, Optional, Tuple
 from urllib.parse import urlparse
 
 import httpx
-import pdfplumber
+import pypdfium2 as pdfium
 from pydantic import BaseModel, Field
 from pypdf import PdfReader
 
+try:
+    import fitz  # PyMuPDF
+except ImportError:  # pragma: no cover - optional native engine
+    fitz = None
+
+try:
+    import re2
+except ImportError:  # pragma: no cover - optional regex engine
+    re2 = None
+
 StudyDesign = Literal["RCT", "cohort", "cross-sectional", "review", "unknown"]
 StudySource = Literal["openalex", "semantic_scholar", "arxiv", "pubmed"]
 
@@ -94,19 +113,89 @@ class ExtractStudiesResponse(BaseModel):
 MAX_PDF_BYTES = 15 * 1024 * 1024
 MAX_PDF_PAGES = 25
 DEFAULT_TIMEOUT_SECONDS = 12
-
+# pdfplumber's layout analysis is slow and not needed for regex extraction;
+# it is only tried when explicitly enabled (and installed)
+USE_PDFPLUMBER = os.getenv("PDF_EXTRACTOR_USE_PDFPLUMBER", "").strip().lower() in ("1", "true", "yes")
+# Resolved hosts are remembered so a batch from one publisher does one DNS lookup
+HOST_CACHE_TTL_SECONDS = 300
+HOST_CACHE_MAX_ENTRIES = 1024
+# Downloads for a batch share one client and overlap up to this limit
+MAX_CONCURRENT_PDF_DOWNLOADS = 8
+PDF_CHUNK_BYTES = 64 * 1024
+PDF_MAGIC = b"%PDF"
+# Papers are independent, so a batch is spread across worker processes
+EXTRACTION_WORKERS = min(8, os.cpu_count() or 1)
+# MuPDF and PDFium are not thread-safe. Pool workers parse one paper at a
+# time, but single-paper batches parse on the event loop's thread pool and
+# can overlap, so native engine calls are serialized per process
+NATIVE_ENGINE_LOCK = threading.Lock()
+
+def compile_pattern(pattern: str, flags: int = 0):
+    """
+    Compile a data-extraction pattern with RE2 when it is installed.
+
+    RE2 matches in linear time, so it wins where re backtracks, such as
+    leading bounded repeats. For short literal
+    alternations on single sentences re is faster, so only patterns that
+    measured faster go through here. Only IGNORECASE is translated (as an
+    inline flag). RE2 has no lookaround and its \\b is ASCII-only, so
+    patterns using either stay on re.compile to keep results unchanged
+    (e.g. "β-blockers versus placebo").
+    """
+    if re2 is None:
+        return re.compile(pattern, flags)
+    return re2.compile(("(?i)" if flags & re.IGNORECASE else "") + pattern)
+
+
+# Sentence-level patterns are written in lowercase and run against
+# lower_aligned() copies, so they don't pay for IGNORECASE; captures are
+# sliced from the original sentence at the same offsets
 EFFECT_PATTERN = re.compile(
-    r"\b(?:OR|RR|HR|SMD|MD|IRR|beta|β|Cohen'?s?\s*d|d)\s*(?:=|:)\s*[-+]?\d+(?:\.\d+)?(?:\s*\([^)]*\))?",
+    r"\b(?:or|rr|hr|smd|md|irr|beta|β|cohen'?s?\s*d|d)\s*(?:=|:)\s*[-+]?\d+(?:\.\d+)?(?:\s*\([^)]*\))?"
+)
+CI_PATTERN = re.compile(r"\b(?:95%\s*ci|ci\s*95%|confidence\s*interval)\b[^.;]*")
+P_VALUE_PATTERN = re.compile(r"\bp\s*(?:=|<|>|<=|>=)\s*0?\.\d+")
+DIGIT_PATTERN = re.compile(r"\d")
+
+# "n = 120" (group 1) takes priority over "120 participants" (group 2)
+SAMPLE_PATTERN = re.compile(
+    r"\b(?:n\s*=\s*(\d{2,7})\b|(\d{2,7})\s+(?:participants|patients|subjects|adults|children|individuals)\b)",
     re.IGNORECASE,
 )
-CI_PATTERN = re.compile(r"\b(?:95%\s*CI|CI\s*95%|confidence\s*interval)\b[^.;]*", re.IGNORECASE)
-P_VALUE_PATTERN = re.compile(r"\bp\s*(?:=|<|>|<=|>=)\s*0?\.\d+", re.IGNORECASE)
 
-SAMPLE_PATTERNS = [
-    re.compile(r"\bn\s*=\s*(\d{2,7})\b", re.IGNORECASE),
-    re.compile(r"\bN\s*=\s*(\d{2,7})\b", re.IGNORECASE),
-    re.compile(r"\b(\d{2,7})\s+(?:participants|patients|subjects|adults|children|individuals)\b", re.IGNORECASE),
+POPULATION_PATTERN = re.compile(
+    r"\b(participants|patients|subjects|adults|children|pregnant|volunteers|individuals)\b"
+)
+
+# All designs in one scan; a design anywhere in the text beats any design
+# listed after it, whatever their positions
+STUDY_DESIGN_PATTERN = re.compile(
+    r"\b(?:"
+    r"(?P<review>meta-analysis|meta analysis|systematic review|scoping review|literature review|review)"
+    r"|(?P<RCT>randomized|randomised|randomly assigned|rct|controlled trial|clinical trial)"
+    r"|(?P<cohort>cohort|prospective|retrospective|follow-up|longitudinal)"
+    r"|(?P<cross_sectional>cross-sectional|cross sectional|prevalence survey|survey)"
+    r")\b"
+)
+STUDY_DESIGN_PRIORITY: List[StudyDesign] = ["review", "RCT", "cohort", "cross-sectional"]
+STUDY_DESIGN_RANKS = {"review": 0, "RCT": 1, "cohort": 2, "cross_sectional": 3}
+
+INTERVENTION_COMPARATOR_PATTERNS = [
+    re.compile(r"\b([^.;,]{2,80}?)\s+(?:vs\.?|versus|compared\s+with|compared\s+to|against)\s+([^.;,]{2,80})"),
+    re.compile(r"\brandomi[sz]ed\s+to\s+([^.;,]{2,80}?)\s+(?:or|versus|vs\.?|compared\s+with)\s+([^.;,]{2,80})"),
+]
+
+OUTCOME_PATTERNS = [
+    re.compile(r"(?:improv(?:ed|ement)?\s+in|increase(?:d)?\s+in|decrease(?:d)?\s+in|reduction\s+in|associated\s+with|effect\s+on)\s+([a-z0-9\s\-]{3,80})"),
+    # The leading {3,80} repeat backtracks badly on re; RE2 is ~15x faster here
+    compile_pattern(r"([a-z0-9\s\-]{3,80})\s+(?:improved|increased|decreased|reduced|was\s+associated)"),
 ]
+ARTICLE_PATTERN = re.compile(r"\b(the|a|an)\b", re.IGNORECASE)
+NON_ALNUM_PATTERN = re.compile(r"[^a-z0-9\s]")
+
+HYPHEN_BREAK_PATTERN = re.compile(r"-\s*\n\s*")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+SENTENCE_BOUNDARY_PATTERN = re.compile(r"(?<=[.!?]) ")
 
 RESULT_MARKERS = [
     "significant",
@@ -126,6 +215,13 @@ RESULT_MARKERS = [
     "vs",
     "compared",
 ]
+# Same substring test as checking each marker in turn, in one C-level scan
+RESULT_MARKER_PATTERN = re.compile("|".join(re.escape(marker) for marker in RESULT_MARKERS))
+
+# extract_outcomes stops reading the text once this many result sentences
+# have been collected; the sentences after that are never split or scanned
+MAX_OUTCOME_CANDIDATES = 64
+NORMALIZE_CACHE_MAX_CHARS = 4096
 
 
 @dataclass
@@ -135,17 +231,60 @@ class ParseOutcome:
 
 
 def normalize_whitespace(raw: str) -> str:
+    # Abstracts, titles and regex captures recur within a batch (excerpt()
+    # re-normalizes the abstract build_study just normalized); full PDF
+    # text is too large to be worth keeping
+    if len(raw) <= NORMALIZE_CACHE_MAX_CHARS:
+        return _normalize_short(raw)
+    return _normalize(raw)
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_short(raw: str) -> str:
+    return _normalize(raw)
+
+
+def _normalize(raw: str) -> str:
     text = raw.replace("\r\n", "\n").replace("\t", " ")
-    text = re.sub(r"-\s*\n\s*", "", text)
-    text = re.sub(r"\s+", " ", text)
+    text = HYPHEN_BREAK_PATTERN.sub("", text)
+    text = WHITESPACE_PATTERN.sub(" ", text)
     return text.strip()
 
 
-def split_sentences(text: str) -> List[str]:
-    normalized = normalize_whitespace(text)
+def lower_aligned(text: str) -> str:
+    """
+    Lowercase text while keeping every character at the same offset.
+
+    "İ" is the only character str.lower() expands (to "i" plus a combining
+    dot), so it is mapped to a plain "i" first when present.
+    """
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = text.replace("\u0130", "i").lower()
+    return lowered
+
+
+def split_sentences(text: str, normalized: bool = False) -> List[str]:
+    # Callers holding normalize_whitespace() output can skip the second pass
     if not normalized:
+        text = normalize_whitespace(text)
+    if not text:
         return []
-    return [s.strip() for s in re.split(r"(?<=[.!?])\s+", normalized) if s.strip()]
+    # Normalized text is stripped and single-spaced, so no piece is empty or padded
+    return SENTENCE_BOUNDARY_PATTERN.split(text)
+
+
+def iter_sentences(text: str, normalized: bool = False) -> Iterator[str]:
+    """Yield the same pieces as split_sentences(), splitting only as far as the caller reads."""
+    if not normalized:
+        text = normalize_whitespace(text)
+    if not text:
+        return
+    start = 0
+    for boundary in SENTENCE_BOUNDARY_PATTERN.finditer(text):
+        yield text[start:boundary.start()]
+        start = boundary.end()
+    yield text[start:]
 
 
 def is_private_host(host: str) -> bool:
@@ -161,21 +300,40 @@ def is_private_host(host: str) -> bool:
     except ValueError:
         pass
 
+    return resolves_to_private(host)
+
+
+_resolved_hosts: Dict[str, Tuple[float, bool]] = {}
+
+
+def resolves_to_private(host: str) -> bool:
+    now = time.monotonic()
+    cached = _resolved_hosts.get(host)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
     try:
         infos = socket.getaddrinfo(host, None)
     except socket.gaierror:
+        # Lookup failures aren't cached; they are often transient
         return True
 
+    private = False
     for info in infos:
         addr = info[4][0]
         try:
             ip = ipaddress.ip_address(addr)
         except ValueError:
-            return True
+            private = True
+            break
         if ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_reserved or ip.is_multicast:
-            return True
+            private = True
+            break
 
-    return False
+    if len(_resolved_hosts) >= HOST_CACHE_MAX_ENTRIES:
+        _resolved_hosts.clear()
+    _resolved_hosts[host] = (now + HOST_CACHE_TTL_SECONDS, private)
+    return private
 
 
 def validate_pdf_url(pdf_url: str) -> Optional[str]:
@@ -189,31 +347,150 @@ def validate_pdf_url(pdf_url: str) -> Optional[str]:
     return None
 
 
-def download_pdf_bytes(pdf_url: str, timeout_seconds: int) -> bytes:
-    with httpx.Client(timeout=timeout_seconds, follow_redirects=True) as client:
-        with client.stream("GET", pdf_url) as response:
-            response.raise_for_status()
-            chunks: List[bytes] = []
-            total = 0
-            for chunk in response.iter_bytes(8192):
-                total += len(chunk)
-                if total > MAX_PDF_BYTES:
-                    raise ValueError("pdf_too_large")
-                chunks.append(chunk)
-            return b"".join(chunks)
+_pdf_client: Optional[httpx.AsyncClient] = None
 
 
-def extract_pdf_text(pdf_bytes: bytes) -> str:
-    text_parts: List[str] = []
+def get_pdf_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide client for PDF downloads, creating it on first use.
+
+    Sharing it across batches keeps TLS sessions to frequent publishers
+    alive, and HTTP/2 lets a batch's requests to one host share a connection.
+    """
+    global _pdf_client
+    if _pdf_client is None:
+        _pdf_client = httpx.AsyncClient(
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+        )
+    return _pdf_client
+
+
+async def close_pdf_client() -> None:
+    global _pdf_client
+    if _pdf_client is not None:
+        await _pdf_client.aclose()
+        _pdf_client = None
+
+
+def check_pdf_headers(headers: httpx.Headers, max_bytes: int) -> None:
+    """
+    Reject a PDF response on its headers alone, before any body is transferred.
+
+    Publishers often label PDFs application/octet-stream, so only an
+    explicit text/* type (usually an HTML landing page) is rejected.
+    """
+    if headers.get("content-type", "").lower().startswith("text/"):
+        raise ValueError("not_pdf")
+    content_length = headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise ValueError("pdf_too_large")
+
+
+async def download_pdf_bytes(client: httpx.AsyncClient, pdf_url: str, timeout_seconds: int) -> bytes:
+    async with client.stream("GET", pdf_url, timeout=timeout_seconds) as response:
+        response.raise_for_status()
+        check_pdf_headers(response.headers, MAX_PDF_BYTES)
+        chunks: List[bytes] = []
+        total = 0
+        async for chunk in response.aiter_bytes(PDF_CHUNK_BYTES):
+            # httpx re-chunks to PDF_CHUNK_BYTES, so the first chunk holds the
+            # whole header; an HTML page is dropped after one read
+            if not chunks and not chunk.startswith(PDF_MAGIC):
+                raise ValueError("invalid_pdf_header")
+            total += len(chunk)
+            if total > MAX_PDF_BYTES:
+                raise ValueError("pdf_too_large")
+            chunks.append(chunk)
+        if not chunks:
+            raise ValueError("invalid_pdf_header")
+        return b"".join(chunks)
+
+
+async def fetch_pdf(
+    client: httpx.AsyncClient,
+    paper: PaperExtractionRequest,
+    timeout_seconds: int,
+) -> Tuple[Optional[bytes], Optional[str]]:
+    """Download a paper's PDF, returning (pdf_bytes, parse_error)."""
+    if not paper.pdf_url:
+        return None, None
+
+    # URL validation may resolve DNS, so keep it off the event loop
+    reason = await asyncio.to_thread(validate_pdf_url, paper.pdf_url)
+    if reason:
+        return None, reason
 
     try:
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            for page in pdf.pages[:MAX_PDF_PAGES]:
-                text = page.extract_text() or ""
+        return await download_pdf_bytes(client, paper.pdf_url, timeout_seconds), None
+    except Exception as exc:  # pragma: no cover - defensive
+        return None, str(exc)[:200]
+
+
+def extract_pymupdf_pages(pdf_bytes: bytes) -> List[str]:
+    text_parts: List[str] = []
+    with NATIVE_ENGINE_LOCK:
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        try:
+            for page in doc.pages(stop=min(MAX_PDF_PAGES, doc.page_count)):
+                text = page.get_text("text")
+                if text:
+                    text_parts.append(text)
+        finally:
+            doc.close()
+    return text_parts
+
+
+def extract_pdfium_pages(pdf_bytes: bytes) -> List[str]:
+    text_parts: List[str] = []
+    with NATIVE_ENGINE_LOCK:
+        pdf = pdfium.PdfDocument(pdf_bytes)
+        try:
+            for index in range(min(len(pdf), MAX_PDF_PAGES)):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                try:
+                    text = textpage.get_text_bounded()
+                finally:
+                    textpage.close()
+                    page.close()
                 if text:
                     text_parts.append(text)
-    except Exception:
-        text_parts = []
+        finally:
+            pdf.close()
+    return text_parts
+
+
+def extract_pdfplumber_pages(pdf_bytes: bytes) -> List[str]:
+    import pdfplumber
+
+    text_parts: List[str] = []
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        for page in pdf.pages[:MAX_PDF_PAGES]:
+            text = page.extract_text() or ""
+            if text:
+                text_parts.append(text)
+    return text_parts
+
+
+def extract_pdf_text(pdf_bytes: bytes) -> str:
+    text_parts: List[str] = []
+
+    # Native engines first (MuPDF, then PDFium); pure-Python parsers are fallbacks
+    engines = [extract_pdfium_pages]
+    if fitz is not None:
+        engines.insert(0, extract_pymupdf_pages)
+    if USE_PDFPLUMBER:
+        engines.append(extract_pdfplumber_pages)
+
+    for engine in engines:
+        try:
+            text_parts = engine(pdf_bytes)
+        except Exception:
+            text_parts = []
+        if text_parts:
+            break
 
     if not text_parts:
         reader = PdfReader(io.BytesIO(pdf_bytes))
@@ -222,11 +499,12 @@ def extract_pdf_text(pdf_bytes: bytes) -> str:
             if text:
                 text_parts.append(text)
 
-    return normalize_whitespace("\n".join(text_parts))
+    # Normalize page by page so the full document is never scanned as one
+    # string. Page text never recurs, so it bypasses the normalize cache
+    return " ".join(filter(None, (_normalize(part) for part in text_parts)))
 
 
-def classify_review_type(text: str) -> Literal["None", "Systematic review", "Meta-analysis"]:
-    lowered = text.lower()
+def classify_review_type(lowered: str) -> Literal["None", "Systematic review", "Meta-analysis"]:
     if "meta-analysis" in lowered or "meta analysis" in lowered:
         return "Meta-analysis"
     if "systematic review" in lowered:
@@ -234,70 +512,68 @@ def classify_review_type(text: str) -> Literal["None", "Systematic review", "Met
     return "None"
 
 
-def classify_study_design(text: str) -> StudyDesign:
-    lowered = text.lower()
-    if re.search(r"\b(meta-analysis|meta analysis|systematic review|scoping review|literature review|review)\b", lowered):
-        return "review"
-    if re.search(r"\b(randomized|randomised|randomly assigned|rct|controlled trial|clinical trial)\b", lowered):
-        return "RCT"
-    if re.search(r"\b(cohort|prospective|retrospective|follow-up|longitudinal)\b", lowered):
-        return "cohort"
-    if re.search(r"\b(cross-sectional|cross sectional|prevalence survey|survey)\b", lowered):
-        return "cross-sectional"
-    return "unknown"
+def classify_study_design(lowered: str) -> StudyDesign:
+    best = len(STUDY_DESIGN_PRIORITY)
+    for match in STUDY_DESIGN_PATTERN.finditer(lowered):
+        rank = STUDY_DESIGN_RANKS[match.lastgroup]
+        if rank < best:
+            best = rank
+            if rank == 0:
+                break
+    return STUDY_DESIGN_PRIORITY[best] if best < len(STUDY_DESIGN_PRIORITY) else "unknown"
 
 
 def extract_sample_size(text: str) -> Optional[int]:
-    for pattern in SAMPLE_PATTERNS:
-        match = pattern.search(text)
-        if not match:
+    fallback: Optional[int] = None
+    for match in SAMPLE_PATTERN.finditer(text):
+        explicit, counted = match.groups()
+        value = int(explicit or counted)
+        if not 2 <= value <= 10_000_000:
             continue
-        value = int(match.group(1))
-        if 2 <= value <= 10_000_000:
+        if explicit:
             return value
-    return None
+        if fallback is None:
+            fallback = value
+    return fallback
 
 
-def extract_population(text: str) -> Optional[str]:
-    for sentence in split_sentences(text):
-        if re.search(r"\b(participants|patients|subjects|adults|children|pregnant|volunteers|individuals)\b", sentence, re.IGNORECASE):
+def extract_population(text: str, normalized: bool = False) -> Optional[str]:
+    for sentence in iter_sentences(text, normalized=normalized):
+        if POPULATION_PATTERN.search(lower_aligned(sentence)):
             return sentence[:220]
     return None
 
 
-def extract_intervention_comparator(sentence: str) -> Tuple[Optional[str], Optional[str]]:
-    patterns = [
-        re.compile(r"\b([^.;,]{2,80}?)\s+(?:vs\.?|versus|compared\s+with|compared\s+to|against)\s+([^.;,]{2,80})", re.IGNORECASE),
-        re.compile(r"\brandomi[sz]ed\s+to\s+([^.;,]{2,80}?)\s+(?:or|versus|vs\.?|compared\s+with)\s+([^.;,]{2,80})", re.IGNORECASE),
-    ]
-
-    for pattern in patterns:
-        match = pattern.search(sentence)
+def extract_intervention_comparator(
+    sentence: str,
+    lowered: Optional[str] = None,
+) -> Tuple[Optional[str], Optional[str]]:
+    if lowered is None:
+        lowered = lower_aligned(sentence)
+    for pattern in INTERVENTION_COMPARATOR_PATTERNS:
+        match = pattern.search(lowered)
         if not match:
             continue
-        intervention = normalize_whitespace(match.group(1)).removeprefix("the ")
-        comparator = normalize_whitespace(match.group(2)).removeprefix("the ")
+        intervention = normalize_whitespace(sentence[match.start(1):match.end(1)]).removeprefix("the ")
+        comparator = normalize_whitespace(sentence[match.start(2):match.end(2)]).removeprefix("the ")
         if intervention and comparator:
             return intervention, comparator
 
     return None, None
 
 
-def infer_outcome(sentence: str) -> str:
-    patterns = [
-        re.compile(r"(?:improv(?:ed|ement)?\s+in|increase(?:d)?\s+in|decrease(?:d)?\s+in|reduction\s+in|associated\s+with|effect\s+on)\s+([a-z0-9\s\-]{3,80})", re.IGNORECASE),
-        re.compile(r"([a-z0-9\s\-]{3,80})\s+(?:improved|increased|decreased|reduced|was\s+associated)", re.IGNORECASE),
-    ]
-
-    for pattern in patterns:
-        match = pattern.search(sentence)
+def infer_outcome(sentence: str, lowered: Optional[str] = None) -> str:
+    if lowered is None:
+        lowered = lower_aligned(sentence)
+    for pattern in OUTCOME_PATTERNS:
+        match = pattern.search(lowered)
         if match and match.group(1):
-            outcome = normalize_whitespace(match.group(1))
-            outcome = re.sub(r"\b(the|a|an)\b", "", outcome, flags=re.IGNORECASE).strip()
+            outcome = normalize_whitespace(sentence[match.start(1):match.end(1)])
+            outcome = ARTICLE_PATTERN.sub("", outcome).strip()
             if len(outcome) >= 3:
                 return outcome[:120]
 
-    tokens = re.sub(r"[^a-z0-9\s]", " ", sentence.lower()).split()
+    tokens = NON_ALNUM_PATTERN.sub(" ", lowered).split()
     tokens = [token for token in tokens if len(token) > 2]
     return " ".join(tokens[:8]) or "reported outcome"
 
@@ -324,12 +600,17 @@ def dedupe_outcomes(items: List[ParseOutcome]) -> List[ParseOutcome]:
     output: List[ParseOutcome] = []
 
     for item in items:
-        key = "|".join([
-            item.outcome.outcome_measured.lower().strip(),
-            (item.outcome.effect_size or "").lower().strip(),
-            (item.outcome.p_value or "").lower().strip(),
-            re.sub(r"\s+", " ", item.outcome.citation_snippet.lower()).strip(),
-        ])
+        # str.split() collapses whitespace like \s+ without a regex pass; the
+        # 16-byte digest keeps the seen set small for long snippets
+        key = hashlib.blake2b(
+            "|".join([
+                item.outcome.outcome_measured.lower().strip(),
+                (item.outcome.effect_size or "").lower().strip(),
+                (item.outcome.p_value or "").lower().strip(),
+                " ".join(item.outcome.citation_snippet.lower().split()),
+            ]).encode("utf-8", "surrogatepass"),
+            digest_size=16,
+        ).digest()
         if key in seen:
             continue
         seen.add(key)
@@ -338,28 +619,61 @@ def dedupe_outcomes(items: List[ParseOutcome]) -> List[ParseOutcome]:
     return output
 
 
-def extract_outcomes(text: str) -> Tuple[List[OutcomeModel], List[float]]:
-    sentences = split_sentences(text)
-    candidates: List[ParseOutcome] = []
+def find_statistics(sentence: str, lowered: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Return the effect size and p-value in a sentence, falling back to the
+    confidence interval when there is no p-value.
 
-    for sentence in sentences:
-        lowered = sentence.lower()
-        if not any(marker in lowered for marker in RESULT_MARKERS):
+    Only the scans that can still change the result are run: effect sizes
+    and p-values both need a digit, and the CI is skipped once a p-value
+    is found.
+    """
+    if lowered is None:
+        lowered = lower_aligned(sentence)
+    effect_size: Optional[str] = None
+    p_value: Optional[str] = None
+    if DIGIT_PATTERN.search(sentence):
+        effect_match = EFFECT_PATTERN.search(lowered)
+        if effect_match:
+            effect_size = normalize_whitespace(sentence[effect_match.start():effect_match.end()])
+        p_match = P_VALUE_PATTERN.search(lowered)
+        if p_match:
+            p_value = normalize_whitespace(sentence[p_match.start():p_match.end()])
+    if p_value is None:
+        ci_match = CI_PATTERN.search(lowered)
+        if ci_match:
+            p_value = normalize_whitespace(sentence[ci_match.start():ci_match.end()])
+    return effect_size, p_value
+
+
+def extract_outcomes(text: str, normalized: bool = False) -> Tuple[List[OutcomeModel], List[float]]:
+    candidates: List[ParseOutcome] = []
+    first_sentence: Optional[str] = None
+
+    for sentence in iter_sentences(text, normalized=normalized):
+        if first_sentence is None:
+            first_sentence = sentence
+        # Results sit early in the text; the rest is mostly methods and references
+        if len(candidates) >= MAX_OUTCOME_CANDIDATES:
+            break
+        # Short pieces opening with "[12]" are reference-list entries
+        if len(sentence) < 40 and sentence[0] == "[":
+            continue
+        lowered = lower_aligned(sentence)
+        if not RESULT_MARKER_PATTERN.search(lowered):
             continue
 
-        intervention, comparator = extract_intervention_comparator(sentence)
-        effect_match = EFFECT_PATTERN.search(sentence)
-        p_match = P_VALUE_PATTERN.search(sentence)
-        ci_match = CI_PATTERN.search(sentence)
+        intervention, comparator = extract_intervention_comparator(sentence, lowered)
+        effect_size, p_value = find_statistics(sentence, lowered)
 
         outcome = OutcomeModel(
-            outcome_measured=infer_outcome(sentence),
+            outcome_measured=infer_outcome(sentence, lowered),
             key_result=sentence,
             citation_snippet=sentence,
             intervention=intervention,
             comparator=comparator,
-            effect_size=normalize_whitespace(effect_match.group(0)) if effect_match else None,
-            p_value=normalize_whitespace(p_match.group(0)) if p_match else (normalize_whitespace(ci_match.group(0)) if ci_match else None),
+            effect_size=effect_size,
+            p_value=p_value,
         )
         candidates.append(ParseOutcome(outcome=outcome, confidence=score_outcome(outcome)))
 
@@ -370,8 +684,8 @@ def extract_outcomes(text: str) -> Tuple[List[OutcomeModel], List[float]]:
         best = sorted(deduped, key=lambda x: x.confidence, reverse=True)[0]
         return [best.outcome], [best.confidence]
 
-    if not filtered and sentences:
-        fallback_sentence = sentences[0][:280]
+    if not filtered and first_sentence is not None:
+        fallback_sentence = first_sentence[:280]
         fallback = OutcomeModel(
             outcome_measured=infer_outcome(fallback_sentence),
             key_result=fallback_sentence,
@@ -405,12 +719,14 @@ def build_study(
     parse_error: Optional[str] = None,
 ) -> ExtractionItemModel:
     text = normalize_whitespace(raw_text or paper.abstract or paper.title)
-    design = classify_study_design(f"{paper.title}. {text}")
-    review_type = classify_review_type(f"{paper.title}. {text}")
+    # Both classifiers work on the same lowercased copy
+    lowered = f"{paper.title}. {text}".lower()
+    design = classify_study_design(lowered)
+    review_type = classify_review_type(lowered)
     if design == "unknown" and review_type != "None":
         design = "review"
 
-    outcomes, confidence = extract_outcomes(text)
+    outcomes, confidence = extract_outcomes(text, normalized=True)
 
     study = StudyResultModel(
         study_id=paper.study_id,
@@ -418,7 +734,7 @@ def build_study(
         year=paper.year,
         study_design=design,
         sample_size=extract_sample_size(text),
-        population=extract_population(text),
+        population=extract_population(text, normalized=True),
         outcomes=outcomes,
         citation=CitationModel(
             doi=paper.doi,
@@ -446,25 +762,20 @@ def build_study(
     return ExtractionItemModel(study_id=paper.study_id, study=study, diagnostics=diagnostics)
 
 
-def extract_one(paper: PaperExtractionRequest, timeout_ms: int) -> ExtractionItemModel:
-    timeout_seconds = max(1, min(60, timeout_ms // 1000 or DEFAULT_TIMEOUT_SECONDS))
-    parse_error: Optional[str] = None
-
-    if paper.pdf_url:
-        reason = validate_pdf_url(paper.pdf_url)
-        if reason:
-            parse_error = reason
-        else:
-            try:
-                pdf_bytes = download_pdf_bytes(paper.pdf_url, timeout_seconds)
-                if not pdf_bytes.startswith(b"%PDF"):
-                    raise ValueError("invalid_pdf_header")
-                text = extract_pdf_text(pdf_bytes)
-                if text:
-                    return build_study(paper, text, engine="pdf")
+def extract_downloaded(
+    paper: PaperExtractionRequest,
+    pdf_bytes: Optional[bytes],
+    parse_error: Optional[str],
+) -> ExtractionItemModel:
+    if pdf_bytes is not None:
+        try:
+            text = extract_pdf_text(pdf_bytes)
+            if not text:
                 parse_error = "empty_pdf_text"
-            except Exception as exc:  # pragma: no cover - defensive
-                parse_error = str(exc)[:200]
+            else:
+                return build_study(paper, text, engine="pdf")
+        except Exception as exc:  # pragma: no cover - defensive
+            parse_error = str(exc)[:200]
 
     return build_study(
         paper,
@@ -475,14 +786,86 @@ def extract_one(paper: PaperExtractionRequest, timeout_ms: int) -> ExtractionIte
     )
 
 
-def extract_studies_batch(request: ExtractStudiesRequest) -> ExtractStudiesResponse:
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    global _extraction_pool
+    if _extraction_pool is None:
+        # Forking this multi-threaded process could hand a worker a copy of
+        # NATIVE_ENGINE_LOCK (or MuPDF's own locks) held by another thread
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else None
+        _extraction_pool = ProcessPoolExecutor(
+            max_workers=EXTRACTION_WORKERS,
+            mp_context=multiprocessing.get_context(start_method),
+        )
+    return _extraction_pool
+
+
+def reset_extraction_pool(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool that lost a worker so the next caller starts a fresh one."""
+    global _extraction_pool
+    if _extraction_pool is broken:
+        _extraction_pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_extraction_pool() -> None:
+    global _extraction_pool
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown(wait=False, cancel_futures=True)
+        _extraction_pool = None
+
+
+async def parse_in_pool(
+    paper: PaperExtractionRequest,
+    pdf_bytes: Optional[bytes],
+    parse_error: Optional[str],
+) -> ExtractionItemModel:
+    """
+    Parse one downloaded paper in the extraction pool.
+
+    A worker that dies (OOM, a crash on a malformed PDF) breaks the whole
+    pool, failing every parse queued on it. The pool is then replaced and
+    the parse retried once; if that fails too the paper falls back to its
+    abstract.
+    """
+    loop = asyncio.get_running_loop()
+    for _ in range(2):
+        pool = get_extraction_pool()
+        try:
+            return await loop.run_in_executor(pool, extract_downloaded, paper, pdf_bytes, parse_error)
+        except BrokenProcessPool:
+            reset_extraction_pool(pool)
+    return await loop.run_in_executor(None, extract_downloaded, paper, None, "extraction_worker_crashed")
+
+
+async def extract_studies_batch(request: ExtractStudiesRequest) -> ExtractStudiesResponse:
     results: List[ExtractionItemModel] = []
     timeout_ms = max(1000, min(60000, int(request.timeout_ms or 12000)))
+    timeout_seconds = max(1, min(60, timeout_ms // 1000 or DEFAULT_TIMEOUT_SECONDS))
 
-    for paper in request.papers:
-        try:
-            results.append(extract_one(paper, timeout_ms))
-        except Exception as exc:  # pragma: no cover - defensive
-            results.append(ExtractionItemModel(study_id=paper.study_id, error=str(exc)[:200]))
+    client = get_pdf_client()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PDF_DOWNLOADS)
+    # Parsing is CPU-bound; a lone paper isn't worth the round trip to a worker process
+    use_pool = len(request.papers) > 1
+    loop = asyncio.get_running_loop()
+
+    async def extract_one(paper: PaperExtractionRequest) -> ExtractionItemModel:
+        # Each paper is handed to the parser as soon as its own download
+        # finishes, so parsing overlaps the downloads still in flight
+        async with semaphore:
+            pdf_bytes, parse_error = await fetch_pdf(client, paper, timeout_seconds)
+        if use_pool:
+            return await parse_in_pool(paper, pdf_bytes, parse_error)
+        return await loop.run_in_executor(None, extract_downloaded, paper, pdf_bytes, parse_error)
+
+    outcomes = await asyncio.gather(*(extract_one(paper) for paper in request.papers), return_exceptions=True)
+
+    for paper, outcome in zip(request.papers, outcomes):
+        if isinstance(outcome, Exception):  # pragma: no cover - defensive
+            results.append(ExtractionItemModel(study_id=paper.study_id, error=str(outcome)[:200]))
+        else:
+            results.append(outcome)
 
     return ExtractStudiesResponse(results=results)
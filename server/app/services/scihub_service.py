@@ -6,22 +6,47 @@ This service handles:
 - Managing temporary download directories
 - Moving PDFs to server/storage/ with unique filenames
 - Returning metadata about the downloaded file
+- Resolving a paper's direct PDF URL and streaming it in-process
 """
 
+import asyncio
 import os
 import tempfile
 import shutil
 import logging
+import threading
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Literal, Optional
 import time
 
+import httpx
+
+from app.services.pdf_extraction_service import PDF_MAGIC, check_pdf_headers
+
 logger = logging.getLogger(__name__)
 
 # Storage directory for downloaded PDFs
 STORAGE_DIR = Path(__file__).parent.parent.parent / "storage"
 STORAGE_DIR.mkdir(exist_ok=True)
 
+# Identifier types SciDownl understands; unknown types silently fall back to DOI
+PaperType = Literal["doi", "pmid", "title"]
+
+STREAM_CHUNK_BYTES = 64 * 1024
+# Saved papers may be scanned or image-heavy, so the cap is looser than the
+# extractor's MAX_PDF_BYTES, but a mirror still can't fill the disk
+MAX_DOWNLOAD_BYTES = 100 * 1024 * 1024
+# Chunks are coalesced so a multi-MB PDF costs a handful of threaded writes
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+MIRROR_TIMEOUT_SECONDS = 30
+MIRROR_POOL_SIZE = 8
+
+# One keep-alive session per resolver thread, reused across tasks
+_session_local = threading.local()
+# Last mirror that produced a PDF link; tried first on the next lookup
+_preferred_mirror: Optional[str] = None
+
 
 def download_paper(keyword: str, paper_type: str = "doi") -> Dict[str, str]:
     """
@@ -92,3 +117,139 @@ def download_paper(keyword: str, paper_type: str = "doi") -> Dict[str, str]:
         except Exception as e:
             logger.error(f"Error downloading paper {keyword}: {str(e)}")
             raise Exception(f"Failed to download paper: {str(e)}")
+
+
+def resolve_pdf_url(keyword: str, paper_type: PaperType = "doi") -> Optional[str]:
+    """
+    Find the direct PDF URL for a paper without downloading it.
+
+    Runs SciDownl's crawl and extract steps against each known Sci-Hub
+    mirror in turn, stopping at the first one that yields a PDF link.
+    This call is blocking and should run off the event loop.
+
+    Args:
+        keyword: Paper identifier (DOI, PubMed ID, or title)
+        paper_type: Type of identifier ("doi", "pmid", or "title")
+
+    Returns:
+        The PDF URL, or None if no mirror could provide one
+    """
+    global _preferred_mirror
+
+    # Import here to avoid import errors if scidownl is not installed
+    try:
+        from scidownl.core.content import HtmlContent
+        from scidownl.core.extractor import HtmlPdfExtractor
+        from scidownl.core.task import ScihubTask
+        from scidownl.exception import ExtractException
+    except ImportError as e:
+        logger.error("Failed to import scidownl: %s", e)
+        raise Exception("SciDownl library not available. Please install requirements.")
+
+    task = ScihubTask(source_keyword=keyword, source_type=paper_type)
+    if len(task.scihub_url_chooser) == 0:
+        task.updater.update_domains()
+        task.scihub_url_chooser = task.scihub_url_chooser_cls()
+
+    mirrors = [scihub_url.url for scihub_url in task.scihub_url_chooser]
+    preferred = _preferred_mirror
+    if preferred in mirrors:
+        mirrors.remove(preferred)
+        mirrors.insert(0, preferred)
+
+    source = task.source_class(keyword)
+    for mirror in mirrors:
+        try:
+            # Same request ScihubCrawler makes, but over the pooled session
+            response = get_session().post(
+                mirror,
+                data={"request": source[source.type]},
+                timeout=MIRROR_TIMEOUT_SECONDS,
+            )
+            if response.status_code != 200:
+                raise Exception(f"HTTP {response.status_code}")
+            task.context["referer"] = mirror
+            pdf_url = HtmlPdfExtractor(HtmlContent(response.content.decode()), task).extract().get_url()
+        except Exception as e:
+            logger.warning(f"Mirror {mirror} failed for {paper_type}:{keyword}: {e}")
+            # The extractor records its own failures; crawl failures are ours
+            if not isinstance(e, ExtractException):
+                task.service.increment_failed_times(mirror)
+            # Stop steering later lookups to a mirror that just failed
+            if _preferred_mirror == mirror:
+                _preferred_mirror = None
+            continue
+        task.service.increment_success_times(mirror)
+        _preferred_mirror = mirror
+        return pdf_url
+
+    logger.error(f"No Sci-Hub mirror returned a PDF for {paper_type}:{keyword}")
+    return None
+
+
+def get_session():
+    """
+    Return this thread's Sci-Hub session, creating it on first use.
+
+    Resolver threads are long-lived, so keeping one session per thread
+    lets TLS connections to the mirrors be reused across downloads.
+    """
+    session = getattr(_session_local, "session", None)
+    if session is None:
+        # requests ships with scidownl; import lazily like scidownl itself
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=MIRROR_POOL_SIZE, pool_maxsize=MIRROR_POOL_SIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _session_local.session = session
+    return session
+
+
+async def stream_pdf(client: httpx.AsyncClient, pdf_url: str, dest: Path) -> None:
+    """
+    Stream a PDF to disk chunk by chunk without buffering it in memory.
+
+    Applies the extractor's checks: text/* responses, bodies that don't
+    start with %PDF and anything over MAX_DOWNLOAD_BYTES are rejected, and
+    a partially written file is removed.
+
+    Args:
+        client: Shared async HTTP client
+        pdf_url: Direct URL of the PDF
+        dest: Destination file path
+
+    Raises:
+        httpx.HTTPError: If the request fails or returns an error status
+        ValueError: If the response is not an acceptable PDF
+    """
+    async with client.stream("GET", pdf_url) as response:
+        response.raise_for_status()
+        check_pdf_headers(response.headers, MAX_DOWNLOAD_BYTES)
+        # Disk writes go to a worker thread, one per filled buffer, so a
+        # slow disk never stalls the event loop
+        f = await asyncio.to_thread(open, dest, "wb")
+        try:
+            buffer = bytearray()
+            total = 0
+            async for chunk in response.aiter_bytes(STREAM_CHUNK_BYTES):
+                if total == 0 and not chunk.startswith(PDF_MAGIC):
+                    raise ValueError("invalid_pdf_header")
+                total += len(chunk)
+                if total > MAX_DOWNLOAD_BYTES:
+                    raise ValueError("pdf_too_large")
+                buffer += chunk
+                if len(buffer) >= WRITE_BUFFER_BYTES:
+                    await asyncio.to_thread(f.write, buffer)
+                    buffer.clear()
+            if total == 0:
+                raise ValueError("invalid_pdf_header")
+            if buffer:
+                await asyncio.to_thread(f.write, buffer)
+        except BaseException:
+            await asyncio.to_thread(f.close)
+            await asyncio.to_thread(dest.unlink, missing_ok=True)
+            raise
+        await asyncio.to_thread(f.close)
@@ -0,0 +1,429 @@
+"""
+Task registries for background download tasks.
+
+Two backends share the same interface:
+- ShardedTaskStore: in-memory, spread across independently locked shards
+- RedisTaskStore: Redis hashes plus a per-status counter hash, used when
+  REDIS_URL is set so state survives restarts and is shared across workers
+
+Status transitions from download workers go through TaskUpdateWriter, which
+batches them into a single store write.
+"""
+
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+TASK_SHARDS = 16
+# A failed batch is retried this many times before its updates are applied one by one
+UPDATE_RETRY_ATTEMPTS = 3
+UPDATE_RETRY_DELAY_SECONDS = 0.2
+# A process's Redis ownership lease; it is renewed well within its lifetime
+OWNER_LEASE_SECONDS = 30
+OWNER_HEARTBEAT_SECONDS = 10
+# Tasks in these states are still owned by a worker and are never evicted
+IN_FLIGHT_STATUSES = ("pending", "processing")
+
+
+class ShardedTaskStore:
+    """
+    Task table split into independently locked shards with FIFO eviction.
+
+    Records are copy-on-write: an update swaps in a new dict rather than
+    mutating the stored one, so readers can look records up without taking
+    a shard lock and never observe a half-applied update. Locks only
+    serialize writers.
+    """
+
+    # Calls are in-memory and safe to make from the event loop
+    blocking = False
+
+    def __init__(self, max_tasks: int, shards: int = TASK_SHARDS):
+        self.max_tasks = max_tasks
+        self._shards: List[Dict[str, dict]] = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        # Creation order across all shards; only touched on add/evict
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+        self._order_lock = threading.Lock()
+        # Per-status counts, maintained on every transition so reads are O(1)
+        self._counts: Counter = Counter()
+        self._counts_lock = threading.Lock()
+
+    def _bucket(self, task_id: str) -> int:
+        return hash(task_id) % len(self._shards)
+
+    def add(self, task_id: str, record: dict) -> List[dict]:
+        """
+        Insert a new task, evicting the oldest finished tasks to make room.
+
+        In-flight tasks are skipped, so the table can grow past max_tasks
+        while they run; later inserts evict as many finished tasks as needed
+        to shrink it back under the cap.
+
+        Returns:
+            The evicted task records, oldest first
+        """
+        evicted: List[dict] = []
+        with self._order_lock:
+            excess = len(self._order) + 1 - self.max_tasks
+            if excess > 0:
+                victims: List[str] = []
+                for old_id in self._order:
+                    if len(victims) >= excess:
+                        break
+                    if self._status(old_id) not in IN_FLIGHT_STATUSES:
+                        victims.append(old_id)
+                for old_id in victims:
+                    del self._order[old_id]
+                    task = self._remove(old_id)
+                    if task is not None:
+                        evicted.append(task)
+            self._order[task_id] = None
+            bucket = self._bucket(task_id)
+            with self._locks[bucket]:
+                self._shards[bucket][task_id] = record
+                self._move_count(None, record["status"])
+        return evicted
+
+    def _status(self, task_id: str) -> Optional[str]:
+        task = self._shards[self._bucket(task_id)].get(task_id)
+        return task["status"] if task is not None else None
+
+    def _remove(self, task_id: str) -> Optional[dict]:
+        bucket = self._bucket(task_id)
+        with self._locks[bucket]:
+            task = self._shards[bucket].pop(task_id, None)
+            if task is not None:
+                self._move_count(task["status"], None)
+            return task
+
+    def _move_count(self, old: Optional[str], new: Optional[str]) -> None:
+        if old == new:
+            return
+        with self._counts_lock:
+            if old is not None:
+                self._counts[old] -= 1
+            if new is not None:
+                self._counts[new] += 1
+
+    def update(self, task_id: str, **fields) -> None:
+        """Merge fields into a task record; no-op if the task was evicted."""
+        self.apply_updates([(task_id, fields)])
+
+    def apply_updates(self, updates: List[Tuple[str, dict]]) -> None:
+        """Apply a batch of updates, taking each shard lock once."""
+        by_bucket: Dict[int, List[Tuple[str, dict]]] = defaultdict(list)
+        for task_id, fields in updates:
+            by_bucket[self._bucket(task_id)].append((task_id, fields))
+
+        for bucket, items in by_bucket.items():
+            with self._locks[bucket]:
+                shard = self._shards[bucket]
+                for task_id, fields in items:
+                    task = shard.get(task_id)
+                    if task is not None:
+                        updated = {**task, **fields}
+                        shard[task_id] = updated
+                        self._move_count(task["status"], updated["status"])
+
+    def get(self, task_id: str) -> Optional[dict]:
+        """Return a copy of a task record, or None if unknown. Lock-free."""
+        task = self._shards[self._bucket(task_id)].get(task_id)
+        return dict(task) if task is not None else None
+
+    def values(self) -> List[dict]:
+        """Return copies of all task records, shard by shard. Lock-free."""
+        records: List[dict] = []
+        for shard in self._shards:
+            # tuple() snapshots the shard in one C-level pass under the GIL
+            records.extend(dict(task) for task in tuple(shard.values()))
+        return records
+
+    def heartbeat(self) -> None:
+        """In-memory tasks can't outlive their process; nothing to renew."""
+
+    def fail_orphaned_tasks(self, error: str) -> int:
+        """In-memory tasks can't outlive their process; nothing to repair."""
+        return 0
+
+    def count_status(self, status: str) -> int:
+        with self._counts_lock:
+            return self._counts[status]
+
+    def __len__(self) -> int:
+        with self._order_lock:
+            return len(self._order)
+
+
+# Atomically insert a task, evicting finished tasks to make room. The caller
+# picks eviction candidates (oldest first) so every key is declared up front;
+# each is re-checked here and skipped if it went back in flight meanwhile.
+# KEYS: order list, status counts hash, new task hash, candidate task hashes...
+# ARGV: max tasks, task id, status, candidate task ids..., field/value pairs...
+_ADD_SCRIPT = """
+local candidates = #KEYS - 3
+local excess = redis.call('LLEN', KEYS[1]) + 1 - tonumber(ARGV[1])
+local evicted = {}
+for i = 1, candidates do
+    if excess <= 0 then
+        break
+    end
+    local old_key = KEYS[3 + i]
+    local old_status = redis.call('HGET', old_key, 'status')
+    if old_status ~= 'pending' and old_status ~= 'processing' then
+        redis.call('LREM', KEYS[1], 1, ARGV[3 + i])
+        if old_status then
+            redis.call('HINCRBY', KEYS[2], old_status, -1)
+            table.insert(evicted, redis.call('HGETALL', old_key))
+            redis.call('DEL', old_key)
+        end
+        excess = excess - 1
+    end
+end
+redis.call('HSET', KEYS[3], unpack(ARGV, 4 + candidates))
+redis.call('RPUSH', KEYS[1], ARGV[2])
+redis.call('HINCRBY', KEYS[2], ARGV[3], 1)
+return evicted
+"""
+
+# Atomically merge fields into an existing task and move its status counter.
+# KEYS: task hash, status counts hash
+# ARGV: field/value pairs...
+_UPDATE_SCRIPT = """
+local old_status = redis.call('HGET', KEYS[1], 'status')
+if not old_status then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV))
+for i = 1, #ARGV, 2 do
+    if ARGV[i] == 'status' and ARGV[i + 1] ~= old_status then
+        redis.call('HINCRBY', KEYS[2], old_status, -1)
+        redis.call('HINCRBY', KEYS[2], ARGV[i + 1], 1)
+    end
+end
+return 1
+"""
+
+
+def _flatten(fields: dict) -> List[str]:
+    pairs: List[str] = []
+    for key, value in fields.items():
+        if value is not None:
+            pairs.extend((key, str(value)))
+    return pairs
+
+
+def _decode(raw: Dict[str, str]) -> dict:
+    task: dict = dict(raw)
+    # Ownership is store bookkeeping, not part of the task record
+    task.pop("owner", None)
+    for key in ("created_at_ns", "completed_at_ns"):
+        if key in task:
+            task[key] = int(task[key])
+    return task
+
+
+class RedisTaskStore:
+    """
+    Task table stored as Redis hashes with O(1) per-status counts.
+
+    Uses the synchronous client because TaskUpdateWriter applies updates
+    from its own thread; every call is a network round trip, so async
+    callers should run them in an executor (see `blocking`).
+
+    All keys share the {tasks} hash tag so the scripts work on Redis
+    Cluster. Each task records the process that owns it, and each process
+    holds a short lease key it keeps refreshing; in-flight tasks whose
+    owner's lease has lapsed (a crash, a killed container) are failed by
+    fail_orphaned_tasks() instead of staying "processing" forever.
+    """
+
+    KEY_PREFIX = "{tasks}:task:"
+    ORDER_KEY = "{tasks}:order"
+    COUNTS_KEY = "{tasks}:counts"
+    OWNER_KEY_PREFIX = "{tasks}:owner:"
+    blocking = True
+
+    def __init__(self, client, max_tasks: int, owner_id: Optional[str] = None):
+        self.max_tasks = max_tasks
+        self.owner_id = owner_id or secrets.token_hex(8)
+        self._client = client
+        self._add = client.register_script(_ADD_SCRIPT)
+        self._update = client.register_script(_UPDATE_SCRIPT)
+
+    def _key(self, task_id: str) -> str:
+        return f"{self.KEY_PREFIX}{task_id}"
+
+    def _eviction_candidates(self) -> List[str]:
+        """Oldest finished tasks that would have to go to fit one more."""
+        task_ids = self._client.lrange(self.ORDER_KEY, 0, -1)
+        excess = len(task_ids) + 1 - self.max_tasks
+        if excess <= 0:
+            return []
+        pipe = self._client.pipeline(transaction=False)
+        for task_id in task_ids:
+            pipe.hget(self._key(task_id), "status")
+        statuses = pipe.execute()
+        finished = [task_id for task_id, status in zip(task_ids, statuses) if status not in IN_FLIGHT_STATUSES]
+        return finished[:excess]
+
+    def add(self, task_id: str, record: dict) -> List[dict]:
+        candidates = self._eviction_candidates()
+        evicted = self._add(
+            keys=[self.ORDER_KEY, self.COUNTS_KEY, self._key(task_id), *map(self._key, candidates)],
+            args=[
+                self.max_tasks,
+                task_id,
+                record["status"],
+                *candidates,
+                *_flatten({**record, "owner": self.owner_id}),
+            ],
+        )
+        return [_decode(dict(zip(raw[::2], raw[1::2]))) for raw in evicted]
+
+    def heartbeat(self) -> None:
+        """Renew this process's ownership lease on the tasks it runs."""
+        self._client.set(f"{self.OWNER_KEY_PREFIX}{self.owner_id}", 1, ex=OWNER_LEASE_SECONDS)
+
+    def fail_orphaned_tasks(self, error: str) -> int:
+        """
+        Mark in-flight tasks whose owning process is gone as failed.
+
+        Returns:
+            The number of tasks that were failed
+        """
+        task_ids = self._client.lrange(self.ORDER_KEY, 0, -1)
+        pipe = self._client.pipeline(transaction=False)
+        for task_id in task_ids:
+            pipe.hmget(self._key(task_id), "status", "owner")
+        in_flight = [
+            (task_id, owner)
+            for task_id, (status, owner) in zip(task_ids, pipe.execute())
+            if status in IN_FLIGHT_STATUSES and owner != self.owner_id
+        ]
+        if not in_flight:
+            return 0
+
+        owners = sorted({owner for _, owner in in_flight if owner})
+        pipe = self._client.pipeline(transaction=False)
+        for owner in owners:
+            pipe.exists(f"{self.OWNER_KEY_PREFIX}{owner}")
+        alive = {owner for owner, exists in zip(owners, pipe.execute()) if exists}
+
+        orphans = [task_id for task_id, owner in in_flight if owner not in alive]
+        if orphans:
+            completed_at_ns = time.time_ns()
+            self.apply_updates([
+                (task_id, {"status": "failed", "completed_at_ns": completed_at_ns, "error": error})
+                for task_id in orphans
+            ])
+        return len(orphans)
+
+    def update(self, task_id: str, **fields) -> None:
+        self._update(keys=[self._key(task_id), self.COUNTS_KEY], args=_flatten(fields))
+
+    def apply_updates(self, updates: List[Tuple[str, dict]]) -> None:
+        """Apply a batch of updates in one pipelined round trip."""
+        pipe = self._client.pipeline(transaction=False)
+        for task_id, fields in updates:
+            self._update(keys=[self._key(task_id), self.COUNTS_KEY], args=_flatten(fields), client=pipe)
+        pipe.execute()
+
+    def get(self, task_id: str) -> Optional[dict]:
+        raw = self._client.hgetall(self._key(task_id))
+        return _decode(raw) if raw else None
+
+    def values(self) -> List[dict]:
+        task_ids = self._client.lrange(self.ORDER_KEY, 0, -1)
+        pipe = self._client.pipeline(transaction=False)
+        for task_id in task_ids:
+            pipe.hgetall(self._key(task_id))
+        return [_decode(raw) for raw in pipe.execute() if raw]
+
+    def count_status(self, status: str) -> int:
+        return int(self._client.hget(self.COUNTS_KEY, status) or 0)
+
+    def __len__(self) -> int:
+        return self._client.llen(self.ORDER_KEY)
+
+
+class TaskUpdateWriter:
+    """
+    Single writer thread that applies queued task updates in batches.
+
+    Download workers enqueue updates without touching store locks or Redis;
+    the writer drains whatever has accumulated and applies it with one
+    apply_updates() call. Updates for a task are applied in the order they
+    were queued. Updates are idempotent, so a batch that fails (e.g. on a
+    Redis hiccup) is simply retried.
+    """
+
+    _STOP = object()
+
+    def __init__(self, store):
+        self._store = store
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="task-update-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, task_id: str, **fields) -> None:
+        self._queue.put((task_id, fields))
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Apply every update queued so far, then stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = self._STOP in batch
+            updates = [item for item in batch if item is not self._STOP]
+            if updates:
+                self._apply(updates)
+            if stopping:
+                return
+
+    def _apply(self, updates: List[Tuple[str, dict]]) -> None:
+        for attempt in range(1, UPDATE_RETRY_ATTEMPTS + 1):
+            try:
+                self._store.apply_updates(updates)
+                return
+            except Exception as e:
+                logger.warning("Applying %d task updates failed (attempt %d): %s", len(updates), attempt, e)
+                time.sleep(UPDATE_RETRY_DELAY_SECONDS * attempt)
+
+        # Still failing: go one by one so a single bad update can't sink the rest
+        for task_id, fields in updates:
+            try:
+                self._store.update(task_id, **fields)
+            except Exception:
+                logger.exception("Dropping update for task %s", task_id)
+
+
+def create_task_store(max_tasks: int):
+    """
+    Build the task store for this process.
+
+    Uses Redis when REDIS_URL is set, otherwise the in-memory sharded store.
+    """
+    redis_url = os.getenv("REDIS_URL", "").strip()
+    if not redis_url:
+        return ShardedTaskStore(max_tasks)
+
+    return RedisTaskStore(redis.Redis.from_url(redis_url, decode_responses=True), max_tasks)
@@ -1,8 +1,17 @@
+import asyncio
+import os
+import socket
+import threading
+import time
 import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
 
+import httpx
 from fastapi.testclient import TestClient
 
 import app.main as main_module
+from app.services import pdf_extraction_service
 
 
 class PdfExtractionContractTests(unittest.TestCase):
@@ -82,5 +91,258 @@ class PdfExtractionContractTests(unittest.TestCase):
             main_module.PDF_EXTRACTOR_BEARER_TOKEN = original_token
 
 
+class PrivateHostCacheTests(unittest.TestCase):
+    def setUp(self):
+        pdf_extraction_service._resolved_hosts.clear()
+
+    def test_host_resolution_is_cached(self):
+        public = [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("93.184.216.34", 0))]
+        with mock.patch.object(pdf_extraction_service.socket, "getaddrinfo", return_value=public) as lookup:
+            self.assertFalse(pdf_extraction_service.is_private_host("papers.example.org"))
+            self.assertFalse(pdf_extraction_service.is_private_host("papers.example.org"))
+        self.assertEqual(lookup.call_count, 1)
+
+    def test_failed_lookups_are_not_cached(self):
+        with mock.patch.object(pdf_extraction_service.socket, "getaddrinfo", side_effect=socket.gaierror) as lookup:
+            self.assertTrue(pdf_extraction_service.is_private_host("flaky.example.org"))
+            self.assertTrue(pdf_extraction_service.is_private_host("flaky.example.org"))
+        self.assertEqual(lookup.call_count, 2)
+
+
+async def stream_body(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+class PdfDownloadTests(unittest.TestCase):
+    def download(self, response: httpx.Response) -> bytes:
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(lambda request: response)) as client:
+                return await pdf_extraction_service.download_pdf_bytes(client, "https://papers.example.org/a.pdf", 5)
+
+        return asyncio.run(run())
+
+    def assertRejected(self, reason: str, response: httpx.Response):
+        with self.assertRaises(ValueError) as ctx:
+            self.download(response)
+        self.assertEqual(str(ctx.exception), reason)
+
+    def test_accepts_pdf_labelled_octet_stream(self):
+        body = b"%PDF-1.7 minimal"
+        response = httpx.Response(200, headers={"content-type": "application/octet-stream"}, content=body)
+        self.assertEqual(self.download(response), body)
+
+    def test_rejects_text_content_type(self):
+        response = httpx.Response(200, headers={"content-type": "text/html; charset=utf-8"}, content=b"%PDF-1.7")
+        self.assertRejected("not_pdf", response)
+
+    def test_rejects_oversized_content_length(self):
+        response = httpx.Response(
+            200,
+            headers={"content-length": str(pdf_extraction_service.MAX_PDF_BYTES + 1)},
+            content=stream_body(b"%PDF-1.7"),
+        )
+        self.assertRejected("pdf_too_large", response)
+
+    def test_rejects_oversized_streamed_body(self):
+        response = httpx.Response(200, content=stream_body(b"%PDF-1.7 ", b"x" * 64))
+        with mock.patch.object(pdf_extraction_service, "MAX_PDF_BYTES", 32):
+            self.assertRejected("pdf_too_large", response)
+
+    def test_rejects_body_without_pdf_header(self):
+        response = httpx.Response(200, content=stream_body(b"<html>Sign in</html>", b"%PDF-1.7"))
+        self.assertRejected("invalid_pdf_header", response)
+
+    def test_rejects_empty_body(self):
+        self.assertRejected("invalid_pdf_header", httpx.Response(200, content=b""))
+
+
+class SampleSizeTests(unittest.TestCase):
+    def test_explicit_n_wins_over_earlier_participant_count(self):
+        text = "We screened 300 patients. The final sample was n = 120."
+        self.assertEqual(pdf_extraction_service.extract_sample_size(text), 120)
+
+    def test_uppercase_n(self):
+        self.assertEqual(pdf_extraction_service.extract_sample_size("Data from N=4500 adults."), 4500)
+
+    def test_falls_back_to_participant_count(self):
+        text = "A cohort of 240 participants and 12 sites."
+        self.assertEqual(pdf_extraction_service.extract_sample_size(text), 240)
+
+    def test_no_sample_size(self):
+        self.assertIsNone(pdf_extraction_service.extract_sample_size("No numbers here, n = 5."))
+
+
+class StudyDesignTests(unittest.TestCase):
+    def classify(self, text):
+        return pdf_extraction_service.classify_study_design(text.lower())
+
+    def test_earlier_design_in_priority_wins_regardless_of_position(self):
+        self.assertEqual(self.classify("A prospective cohort nested in a randomized trial."), "RCT")
+        self.assertEqual(self.classify("Randomized controlled trial; see our systematic review."), "review")
+        self.assertEqual(self.classify("A cross-sectional survey within a longitudinal cohort."), "cohort")
+
+    def test_single_and_missing_designs(self):
+        self.assertEqual(self.classify("A cross-sectional survey of nurses."), "cross-sectional")
+        self.assertEqual(self.classify("Case report of a rare rash."), "unknown")
+
+
+class OutcomeExtractionTests(unittest.TestCase):
+    def test_outcome_candidates_are_capped(self):
+        text = " ".join(
+            f"Drug {i} versus placebo reduced pain score {i} (OR = 1.{i}, p = 0.0{i % 10})." for i in range(100)
+        )
+        outcomes, confidences = pdf_extraction_service.extract_outcomes(text)
+
+        self.assertEqual(len(outcomes), pdf_extraction_service.MAX_OUTCOME_CANDIDATES)
+        self.assertEqual(len(confidences), len(outcomes))
+        self.assertTrue(outcomes[0].key_result.startswith("Drug 0 "))
+        self.assertTrue(outcomes[-1].key_result.startswith("Drug 63 "))
+
+    def test_iter_sentences_matches_split_sentences(self):
+        for text in ("", "One. Two! Three? Four", "  No boundary here  ", "Trailing. "):
+            self.assertEqual(
+                list(pdf_extraction_service.iter_sentences(text)),
+                pdf_extraction_service.split_sentences(text),
+            )
+
+
+class LowerAlignedTests(unittest.TestCase):
+    # str.lower() turns each "İ" (U+0130) into two characters
+    SENTENCE = "İİ İzmir cohort given Melatonin versus Placebo showed a Reduction in Sleep Latency (OR = 1.2, p = 0.03)."
+
+    def test_keeps_offsets_when_lower_would_expand(self):
+        lowered = pdf_extraction_service.lower_aligned(self.SENTENCE)
+        self.assertNotEqual(len(self.SENTENCE.lower()), len(self.SENTENCE))
+        self.assertEqual(len(lowered), len(self.SENTENCE))
+        self.assertTrue(lowered.startswith("ii izmir cohort"))
+
+    def test_spans_are_sliced_from_the_original_sentence(self):
+        intervention, comparator = pdf_extraction_service.extract_intervention_comparator(self.SENTENCE)
+        self.assertEqual(intervention, "İİ İzmir cohort given Melatonin")
+        self.assertTrue(comparator.startswith("Placebo showed a Reduction"))
+        self.assertEqual(pdf_extraction_service.infer_outcome(self.SENTENCE), "Sleep Latency")
+        self.assertEqual(pdf_extraction_service.find_statistics(self.SENTENCE), ("OR = 1.2", "p = 0.03"))
+
+
+def abstract_only_paper(study_id: str) -> pdf_extraction_service.PaperExtractionRequest:
+    return pdf_extraction_service.PaperExtractionRequest(
+        study_id=study_id,
+        title="Randomized melatonin trial",
+        year=2024,
+        source="pubmed",
+        abstract="Melatonin versus placebo improved sleep quality in 120 participants (p = 0.02).",
+    )
+
+
+class ExtractionPoolTests(unittest.TestCase):
+    def tearDown(self):
+        pdf_extraction_service.shutdown_extraction_pool()
+
+    def test_broken_pool_is_replaced(self):
+        broken = ProcessPoolExecutor(max_workers=1)
+        self.assertIsNotNone(broken.submit(os._exit, 1).exception())
+        pdf_extraction_service._extraction_pool = broken
+
+        request = pdf_extraction_service.ExtractStudiesRequest(
+            papers=[abstract_only_paper("a"), abstract_only_paper("b")],
+        )
+        response = asyncio.run(pdf_extraction_service.extract_studies_batch(request))
+
+        for item in response.results:
+            self.assertIsNone(item.error)
+            self.assertEqual(item.diagnostics.engine, "abstract")
+            self.assertEqual(item.diagnostics.fallback_reason, "missing_pdf_url")
+        self.assertIsNot(pdf_extraction_service._extraction_pool, broken)
+
+
+@unittest.skipIf(pdf_extraction_service.fitz is None, "PyMuPDF is needed to build the test PDF")
+class ExtractDownloadedTests(unittest.TestCase):
+    def test_pdf_text_without_result_markers_is_kept(self):
+        doc = pdf_extraction_service.fitz.open()
+        doc.new_page().insert_text((50, 72), "Melatonin dosing in 80 adults with delayed sleep phase.")
+        pdf_bytes = doc.tobytes()
+        doc.close()
+
+        item = pdf_extraction_service.extract_downloaded(abstract_only_paper("a"), pdf_bytes, None)
+
+        self.assertEqual(item.diagnostics.engine, "pdf")
+        self.assertIsNone(item.diagnostics.parse_error)
+        self.assertEqual(item.study.sample_size, 80)
+
+
+@unittest.skipIf(pdf_extraction_service.fitz is None, "PyMuPDF is needed to build the test PDF")
+class ConcurrentSinglePaperTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        doc = pdf_extraction_service.fitz.open()
+        doc.new_page().insert_text((50, 72), "Melatonin versus placebo reduced sleep latency (OR = 0.5, p = 0.01).")
+        cls.pdf_bytes = doc.tobytes()
+        doc.close()
+
+    def setUp(self):
+        pdf = self.pdf_bytes
+        pdf_extraction_service._pdf_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, headers={"content-type": "application/pdf"}, content=pdf)
+            )
+        )
+
+    def tearDown(self):
+        client, pdf_extraction_service._pdf_client = pdf_extraction_service._pdf_client, None
+        asyncio.run(client.aclose())
+
+    def track_overlap(self, open_document):
+        """Wrap a document constructor, recording how many calls overlap."""
+        state = {"active": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def wrapper(*args, **kwargs):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            try:
+                time.sleep(0.05)
+                return open_document(*args, **kwargs)
+            finally:
+                with lock:
+                    state["active"] -= 1
+
+        return wrapper, state
+
+    def run_two_batches(self):
+        def request(study_id):
+            paper = abstract_only_paper(study_id).model_copy(update={"pdf_url": "https://papers.example.org/a.pdf"})
+            return pdf_extraction_service.ExtractStudiesRequest(papers=[paper])
+
+        async def both():
+            return await asyncio.gather(
+                pdf_extraction_service.extract_studies_batch(request("a")),
+                pdf_extraction_service.extract_studies_batch(request("b")),
+            )
+
+        with mock.patch.object(pdf_extraction_service, "validate_pdf_url", return_value=None):
+            return asyncio.run(both())
+
+    def test_pymupdf_parses_do_not_overlap(self):
+        wrapper, state = self.track_overlap(pdf_extraction_service.fitz.open)
+        with mock.patch.object(pdf_extraction_service.fitz, "open", wrapper):
+            responses = self.run_two_batches()
+
+        self.assertEqual(state["peak"], 1)
+        for response in responses:
+            self.assertEqual(response.results[0].diagnostics.engine, "pdf")
+
+    def test_pdfium_parses_do_not_overlap(self):
+        wrapper, state = self.track_overlap(pdf_extraction_service.pdfium.PdfDocument)
+        with mock.patch.object(pdf_extraction_service, "fitz", None), \
+                mock.patch.object(pdf_extraction_service.pdfium, "PdfDocument", wrapper):
+            responses = self.run_two_batches()
+
+        self.assertEqual(state["peak"], 1)
+        for response in responses:
+            self.assertEqual(response.results[0].diagnostics.engine, "pdf")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,156 @@
+import asyncio
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import httpx
+
+from app.services import scihub_service
+
+MIRRORS = ["https://mirror-a.example", "https://mirror-b.example", "https://mirror-c.example"]
+
+
+class FakeSource(dict):
+    def __init__(self, keyword):
+        super().__init__(doi=keyword)
+        self.type = "doi"
+
+
+class FakeTask:
+    """Just the parts of scidownl's ScihubTask that resolve_pdf_url touches."""
+
+    service = mock.Mock()
+
+    def __init__(self, source_keyword, source_type):
+        self.scihub_url_chooser = [mock.Mock(url=url) for url in MIRRORS]
+        self.source_class = FakeSource
+        self.context = {}
+
+
+class FakeExtractor:
+    def __init__(self, content, task):
+        self.task = task
+
+    def extract(self):
+        return mock.Mock(get_url=mock.Mock(return_value=f"{self.task.context['referer']}/paper.pdf"))
+
+
+class ResolvePdfUrlTests(unittest.TestCase):
+    def setUp(self):
+        scihub_service._preferred_mirror = None
+        FakeTask.service = mock.Mock()
+        self.session = mock.Mock()
+        patches = [
+            mock.patch("scidownl.core.task.ScihubTask", FakeTask),
+            mock.patch("scidownl.core.extractor.HtmlPdfExtractor", FakeExtractor),
+            mock.patch.object(scihub_service, "get_session", return_value=self.session),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        scihub_service._preferred_mirror = None
+
+    def respond(self, statuses):
+        """Answer each mirror's POST with the given status code."""
+        def post(mirror, data, timeout):
+            return mock.Mock(status_code=statuses.get(mirror, 200), content=b"<html></html>")
+
+        self.session.post.side_effect = post
+
+    def posted_mirrors(self):
+        return [call.args[0] for call in self.session.post.call_args_list]
+
+    def test_falls_back_past_failing_mirrors(self):
+        self.respond({MIRRORS[0]: 503})
+
+        self.assertEqual(scihub_service.resolve_pdf_url("10.1000/x"), f"{MIRRORS[1]}/paper.pdf")
+        self.assertEqual(self.posted_mirrors(), MIRRORS[:2])
+        FakeTask.service.increment_failed_times.assert_called_once_with(MIRRORS[0])
+        FakeTask.service.increment_success_times.assert_called_once_with(MIRRORS[1])
+
+    def test_successful_mirror_is_tried_first_next_time(self):
+        self.respond({MIRRORS[0]: 503, MIRRORS[1]: 503})
+        scihub_service.resolve_pdf_url("10.1000/x")
+        self.session.post.reset_mock()
+
+        self.respond({})
+        self.assertEqual(scihub_service.resolve_pdf_url("10.1000/y"), f"{MIRRORS[2]}/paper.pdf")
+        self.assertEqual(self.posted_mirrors(), [MIRRORS[2]])
+
+    def test_failing_preferred_mirror_is_dropped(self):
+        scihub_service._preferred_mirror = MIRRORS[2]
+        self.respond({MIRRORS[2]: 500})
+
+        self.assertEqual(scihub_service.resolve_pdf_url("10.1000/x"), f"{MIRRORS[0]}/paper.pdf")
+        self.assertEqual(self.posted_mirrors(), [MIRRORS[2], MIRRORS[0]])
+        self.assertEqual(scihub_service._preferred_mirror, MIRRORS[0])
+
+    def test_returns_none_when_every_mirror_fails(self):
+        self.respond({mirror: 404 for mirror in MIRRORS})
+
+        self.assertIsNone(scihub_service.resolve_pdf_url("10.1000/x"))
+        self.assertIsNone(scihub_service._preferred_mirror)
+        self.assertEqual(FakeTask.service.increment_failed_times.call_count, len(MIRRORS))
+
+
+async def stream_body(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+class StreamPdfTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        self.dest = self.dir / "paper.pdf"
+
+    def stream(self, response: httpx.Response) -> None:
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(lambda request: response)) as client:
+                await scihub_service.stream_pdf(client, "https://mirror-a.example/paper.pdf", self.dest)
+
+        asyncio.run(run())
+
+    def assertRejected(self, error, response: httpx.Response):
+        with self.assertRaises(error) as ctx:
+            self.stream(response)
+        self.assertFalse(self.dest.exists())
+        return ctx.exception
+
+    def test_writes_pdf_to_disk(self):
+        body = b"%PDF-1.7 " + b"x" * 200_000
+        self.stream(httpx.Response(200, headers={"content-type": "application/pdf"}, content=body))
+        self.assertEqual(self.dest.read_bytes(), body)
+
+    def test_rejects_error_status(self):
+        self.assertRejected(httpx.HTTPStatusError, httpx.Response(404, content=b"missing"))
+
+    def test_rejects_html_page(self):
+        error = self.assertRejected(
+            ValueError,
+            httpx.Response(200, headers={"content-type": "text/html"}, content=b"<html>captcha</html>"),
+        )
+        self.assertEqual(str(error), "not_pdf")
+
+    def test_rejects_body_without_pdf_header(self):
+        error = self.assertRejected(ValueError, httpx.Response(200, content=stream_body(b"<html>", b"%PDF")))
+        self.assertEqual(str(error), "invalid_pdf_header")
+
+    def test_rejects_empty_body(self):
+        error = self.assertRejected(ValueError, httpx.Response(200, content=b""))
+        self.assertEqual(str(error), "invalid_pdf_header")
+
+    def test_oversized_body_leaves_no_partial_file(self):
+        response = httpx.Response(200, content=stream_body(b"%PDF-1.7 ", b"x" * 64, b"x" * 64))
+        with mock.patch.object(scihub_service, "MAX_DOWNLOAD_BYTES", 100), \
+                mock.patch.object(scihub_service, "WRITE_BUFFER_BYTES", 16):
+            error = self.assertRejected(ValueError, response)
+        self.assertEqual(str(error), "pdf_too_large")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,266 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from app.services import task_store
+from app.services.task_store import RedisTaskStore, ShardedTaskStore, TaskUpdateWriter
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover - optional test dependency
+    fakeredis = None
+
+
+class ShardedTaskStoreTests(unittest.TestCase):
+    def test_evicts_oldest_task_when_full(self):
+        store = ShardedTaskStore(max_tasks=3)
+        for i in range(3):
+            self.assertEqual(store.add(f"t{i}", {"task_id": f"t{i}", "status": "completed"}), [])
+
+        evicted = store.add("t3", {"task_id": "t3", "status": "pending"})
+        self.assertEqual([task["task_id"] for task in evicted], ["t0"])
+        self.assertIsNone(store.get("t0"))
+        self.assertEqual(len(store), 3)
+
+    def test_in_flight_tasks_are_not_evicted(self):
+        store = ShardedTaskStore(max_tasks=2)
+        store.add("a", {"task_id": "a", "status": "processing"})
+        store.add("b", {"task_id": "b", "status": "completed"})
+
+        evicted = store.add("c", {"task_id": "c", "status": "pending"})
+        self.assertEqual([task["task_id"] for task in evicted], ["b"])
+        self.assertIsNotNone(store.get("a"))
+        self.assertEqual(len(store), 2)
+
+        self.assertEqual(store.add("d", {"task_id": "d", "status": "pending"}), [])
+        self.assertEqual(len(store), 3)
+
+    def test_table_shrinks_back_once_in_flight_tasks_finish(self):
+        store = ShardedTaskStore(max_tasks=3)
+        for i in range(6):
+            store.add(f"t{i}", {"task_id": f"t{i}", "status": "processing"})
+        self.assertEqual(len(store), 6)
+
+        for i in range(6):
+            store.update(f"t{i}", status="completed")
+
+        evicted = store.add("t6", {"task_id": "t6", "status": "pending"})
+        self.assertEqual([task["task_id"] for task in evicted], ["t0", "t1", "t2", "t3"])
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.count_status("completed"), 2)
+
+    def test_update_and_count_status(self):
+        store = ShardedTaskStore(max_tasks=10)
+        store.add("a", {"task_id": "a", "status": "pending"})
+        store.add("b", {"task_id": "b", "status": "pending"})
+
+        store.update("a", status="processing")
+        store.update("missing", status="processing")
+
+        self.assertEqual(store.get("a")["status"], "processing")
+        self.assertEqual(store.count_status("processing"), 1)
+        self.assertEqual(len(store.values()), 2)
+
+    def test_status_counts_follow_transitions_and_eviction(self):
+        store = ShardedTaskStore(max_tasks=2)
+        store.add("a", {"task_id": "a", "status": "pending"})
+        store.add("b", {"task_id": "b", "status": "pending"})
+        store.update("a", status="processing")
+        store.update("a", status="completed")
+
+        store.add("c", {"task_id": "c", "status": "pending"})
+
+        self.assertEqual(store.count_status("processing"), 0)
+        self.assertEqual(store.count_status("completed"), 0)
+        self.assertEqual(store.count_status("pending"), 2)
+
+    def test_apply_updates_batch(self):
+        store = ShardedTaskStore(max_tasks=10)
+        store.add("a", {"task_id": "a", "status": "pending"})
+        store.add("b", {"task_id": "b", "status": "pending"})
+
+        store.apply_updates([
+            ("a", {"status": "processing"}),
+            ("b", {"status": "processing"}),
+            ("a", {"status": "completed", "filename": "a.pdf"}),
+        ])
+
+        self.assertEqual(store.get("a")["filename"], "a.pdf")
+        self.assertEqual(store.count_status("completed"), 1)
+        self.assertEqual(store.count_status("processing"), 1)
+
+    def test_updates_replace_records_instead_of_mutating(self):
+        store = ShardedTaskStore(max_tasks=10)
+        record = {"task_id": "a", "status": "pending"}
+        store.add("a", record)
+        before = store.get("a")
+
+        store.update("a", status="processing")
+
+        self.assertEqual(record["status"], "pending")
+        self.assertEqual(before["status"], "pending")
+        self.assertEqual(store.get("a")["status"], "processing")
+
+
+class TaskUpdateWriterTests(unittest.TestCase):
+    def test_close_applies_queued_updates_in_order(self):
+        store = ShardedTaskStore(max_tasks=10)
+        store.add("a", {"task_id": "a", "status": "pending"})
+        store.add("b", {"task_id": "b", "status": "pending"})
+        writer = TaskUpdateWriter(store)
+
+        writer.put("a", status="processing")
+        writer.put("b", status="processing")
+        writer.put("a", status="completed", filename="a.pdf")
+        writer.close(timeout=5)
+
+        self.assertFalse(writer._thread.is_alive())
+        self.assertEqual(store.get("a")["status"], "completed")
+        self.assertEqual(store.get("a")["filename"], "a.pdf")
+        self.assertEqual(store.get("b")["status"], "processing")
+        self.assertEqual(store.count_status("pending"), 0)
+
+    def test_failed_batches_are_retried(self):
+        store = ShardedTaskStore(max_tasks=10)
+        store.add("a", {"task_id": "a", "status": "processing"})
+        apply_updates = store.apply_updates
+        calls = []
+
+        def flaky(updates):
+            calls.append(updates)
+            if len(calls) == 1:
+                raise ConnectionError("redis went away")
+            apply_updates(updates)
+
+        with mock.patch.object(store, "apply_updates", side_effect=flaky), \
+                mock.patch.object(task_store, "UPDATE_RETRY_DELAY_SECONDS", 0):
+            writer = TaskUpdateWriter(store)
+            writer.put("a", status="completed")
+            writer.close(timeout=5)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(store.get("a")["status"], "completed")
+
+    def test_falls_back_to_single_updates_when_batches_keep_failing(self):
+        store = ShardedTaskStore(max_tasks=10)
+        store.add("a", {"task_id": "a", "status": "processing"})
+
+        with mock.patch.object(store, "apply_updates", side_effect=ConnectionError("down")), \
+                mock.patch.object(store, "update", wraps=store.update) as update, \
+                mock.patch.object(task_store, "UPDATE_RETRY_DELAY_SECONDS", 0):
+            writer = TaskUpdateWriter(store)
+            writer.put("a", status="completed")
+            writer.close(timeout=5)
+
+        update.assert_called_once_with("a", status="completed")
+
+
+class InterruptedDownloadTests(unittest.TestCase):
+    def test_cancelled_download_records_a_failed_status(self):
+        import app.main as main_module
+
+        store = ShardedTaskStore(max_tasks=10)
+        store.add("t", {"task_id": "t", "status": "pending", "created_at_ns": 1})
+        writer = TaskUpdateWriter(store)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_lookup(*args):
+            started.set()
+            release.wait(5)
+
+        async def cancel_mid_lookup():
+            task = asyncio.create_task(main_module.download_paper_task("t", "10.1000/x", "doi"))
+            await asyncio.to_thread(started.wait, 5)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with mock.patch.object(main_module, "task_updates", writer), \
+                mock.patch.object(main_module, "resolve_task_pdf_url", slow_lookup):
+            try:
+                asyncio.run(cancel_mid_lookup())
+            finally:
+                release.set()
+        writer.close(timeout=5)
+
+        task = store.get("t")
+        self.assertEqual(task["status"], "failed")
+        self.assertEqual(task["error"], main_module.ORPHANED_TASK_ERROR)
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis is not installed")
+class RedisTaskStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.store = RedisTaskStore(fakeredis.FakeRedis(decode_responses=True), max_tasks=3)
+
+    def add(self, task_id: str, status: str):
+        return self.store.add(task_id, {"task_id": task_id, "status": status, "created_at_ns": 1})
+
+    def test_evicts_oldest_finished_task_when_full(self):
+        self.add("a", "processing")
+        self.add("b", "completed")
+        self.add("c", "completed")
+
+        evicted = self.add("d", "pending")
+        self.assertEqual(evicted, [{"task_id": "b", "status": "completed", "created_at_ns": 1}])
+        self.assertIsNone(self.store.get("b"))
+        self.assertIsNotNone(self.store.get("a"))
+        self.assertEqual([task["task_id"] for task in self.store.values()], ["a", "c", "d"])
+
+    def test_update_and_count_status(self):
+        self.add("a", "pending")
+        self.add("b", "pending")
+
+        self.store.update("a", status="processing")
+        self.store.update("missing", status="processing")
+        self.store.apply_updates([("a", {"status": "completed", "completed_at_ns": 5}), ("b", {"status": "processing"})])
+
+        task = self.store.get("a")
+        self.assertEqual(task["status"], "completed")
+        self.assertEqual(task["completed_at_ns"], 5)
+        self.assertIsNone(self.store.get("missing"))
+        self.assertEqual(self.store.count_status("completed"), 1)
+        self.assertEqual(self.store.count_status("processing"), 1)
+        self.assertEqual(self.store.count_status("pending"), 0)
+
+    def test_tasks_of_a_dead_process_are_failed(self):
+        client = self.store._client
+        other = RedisTaskStore(client, max_tasks=3)
+        self.store.heartbeat()
+        other.heartbeat()
+        self.add("mine", "processing")
+        other.add("theirs", {"task_id": "theirs", "status": "processing", "created_at_ns": 1})
+        other.add("done", {"task_id": "done", "status": "completed", "created_at_ns": 1})
+
+        self.assertEqual(self.store.fail_orphaned_tasks("interrupted"), 0)
+
+        client.delete(f"{RedisTaskStore.OWNER_KEY_PREFIX}{other.owner_id}")
+        self.assertEqual(self.store.fail_orphaned_tasks("interrupted"), 1)
+
+        theirs = self.store.get("theirs")
+        self.assertEqual(theirs["status"], "failed")
+        self.assertEqual(theirs["error"], "interrupted")
+        self.assertIn("completed_at_ns", theirs)
+        self.assertNotIn("owner", theirs)
+        self.assertEqual(self.store.get("mine")["status"], "processing")
+        self.assertEqual(self.store.count_status("processing"), 1)
+        self.assertEqual(self.store.count_status("failed"), 1)
+
+    def test_table_shrinks_back_once_in_flight_tasks_finish(self):
+        for i in range(6):
+            self.add(f"t{i}", "processing")
+        self.assertEqual(len(self.store), 6)
+
+        for i in range(6):
+            self.store.update(f"t{i}", status="completed")
+
+        evicted = self.add("t6", "pending")
+        self.assertEqual([task["task_id"] for task in evicted], ["t0", "t1", "t2", "t3"])
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.store.count_status("completed"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()